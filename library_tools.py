@@ -1,6 +1,15 @@
 """
 Provides base classes.
 
+Provided Functions
+------------------
+
+ensure_log_directory
+    Creates a log directory if it does not exist, once per process.
+
+get_module_logger
+    Returns a module's logger, with its log file opened on first use.
+
 Provided Classes
 ------------------
 
@@ -106,19 +115,31 @@ class UniqueInstancesClass(type):
             logger.warning(message)
             return None
 
-        cls._id = "{0}:{1}".format(cls.__name__, unique_identifier)
+        # Logging may create instances too (see get_module_logger), so the
+        # rest of this call works from a local copy of the identifier.
+
+        id_ = cls._id = "{0}:{1}".format(cls.__name__, unique_identifier)
 
-        if cls._id not in cls._instances:
-            logger.info("Creating new instance of {0} with id_ {1}"
-                        .format(cls.__name__, cls._id))
+        if id_ not in cls._instances:
             self = cls.__new__(cls, *args)
-            cls._instances[cls._id] = self
-            cls.__init__(self, *args, **kwargs)
+            cls._instances[id_] = self
+
+            try:
+                cls.__init__(self, *args, **kwargs)
+            except Exception:
+                del cls._instances[id_]
+                raise
+
+            # Logged once the instance is ready, as logging can itself ask
+            # for this instance.
+
+            logger.info("Created new instance of {0} with id_ {1}"
+                        .format(cls.__name__, id_))
         else:
             logger.info("An instance of {0} with id_ {1} already exists.".
-                        format(cls.__name__, cls._id))
+                        format(cls.__name__, id_))
 
-        return cls._instances[cls._id]
+        return cls._instances[id_]
 
     def __init__(cls, *args, **kwargs):
 
@@ -167,17 +188,52 @@ class ConfigReader(object):
 
         """
 
-        self.config = ConfigParser()
         self.config_file = config_file
+        self._read()
+
+    def _read(self):
+
+        """Parse the configuration file, noting its modification time and
+        size.
+
+        """
+
+        self.config = ConfigParser()
         self.raw_config = RawConfigParser()
+        self._raw_config_read = False
 
         try:
-            self.config.readfp(open(self.config_file))
+            with open(self.config_file) as f:
+                stat = os.fstat(f.fileno())
+                self.config.readfp(f)
         except IOError as e:
             print e
             logger.error("IOError: {0}".format(e))
             raise
 
+        self._file_stat = (stat.st_mtime, stat.st_size)
+
+    def refresh(self):
+
+        """Re-read the configuration file if its modification time or size
+        has changed since it was last read.
+
+        Notes:
+            ConfigReader instances are shared per configuration file (see
+            UniqueInstancesClass), so an unchanged file costs one os.stat
+            here rather than a parse.
+
+        """
+
+        try:
+            stat = os.stat(self.config_file)
+        except OSError as e:
+            logger.error("OSError: {0}".format(e))
+            return
+
+        if (stat.st_mtime, stat.st_size) != self._file_stat:
+            self._read()
+
     def get_item(self, section, item):
 
         """Return an item from the configuration file.
@@ -197,11 +253,18 @@ class ConfigReader(object):
             raise
         except InterpolationMissingOptionError, e:
 
-            try:
-                self.raw_config.readfp(open(self.config_file))
-            except IOError as e:
-                logger.error("IOError: {0}".format(e))
-                raise
+            # Items such as log formats hold literal %(...)s fields. Parse
+            # the file without interpolation once, on the first such item.
+
+            if not self._raw_config_read:
+                try:
+                    with open(self.config_file) as f:
+                        self.raw_config.readfp(f)
+                except IOError as e:
+                    logger.error("IOError: {0}".format(e))
+                    raise
+
+                self._raw_config_read = True
 
             return self.raw_config.get(section.lower(), item.lower())
 
@@ -339,35 +402,153 @@ class ConfigReader(object):
         with open(self.config_file, "w") as f:
             self.config.write(f)
 
+        # Pick up the written file, including in raw_config.
+
+        self._read()
+
+
+###############################################################################
+
+# Log directories known to exist.
+
+_log_directories_ready = set()
+
+
+def get_module_logger(name):
+
+    """Return the logger for a module, set up as given in logging.cfg.
+
+    Arguments:
+        name (str): The module name (__name__). The module logs to
+                    <log_directory>/<name><log_extension>.
+
+    Notes:
+        Reading logging.cfg and opening the module's log file are deferred
+        until the logger's first record, so a module that never logs opens
+        no log file.
+
+    """
+
+    module_logger = logging.getLogger(name)
+
+    # Let every record through to the deferred handler; the level from
+    # logging.cfg is applied when the file handler is set up.
+
+    module_logger.setLevel(logging.DEBUG)
+    module_logger.addHandler(_DeferredModuleHandler(module_logger))
+
+    return module_logger
+
+
+class _DeferredModuleHandler(logging.Handler):
+
+    """Stands in for a module's file handler until its first record.
+
+    """
+
+    def __init__(self, module_logger):
+
+        logging.Handler.__init__(self)
+        self.module_logger = module_logger
+        self._pending = None
+
+    def emit(self, record):
+
+        # handle() holds this handler's lock, so only the first record
+        # sets up the file handler. Setting it up can itself log (this
+        # module logs the creation of the ConfigReader it uses); such
+        # records are held until the file handler is attached.
+
+        module_logger = self.module_logger
+
+        if self._pending is not None:
+            self._pending.append(record)
+            return
+
+        if self in module_logger.handlers:
+            self._pending = []
+
+            # A failed setup (e.g. a missing logging.cfg or log file) is
+            # reported like any other handler error rather than raised into
+            # the caller; this handler stays in place to retry on the next
+            # record.
+
+            try:
+                _add_module_file_handler(module_logger)
+            except Exception:
+                self._pending = None
+                self.handleError(record)
+                return
+
+            module_logger.removeHandler(self)
+            pending, self._pending = self._pending, None
+
+            module_logger.info("-" * 64)
+            module_logger.info("**** Imported by {0} ****"
+                               .format(getattr(__main__, "__file__",
+                                               "interactive session")))
+        else:
+            pending = []
+
+        for record in [record] + pending:
+            if module_logger.isEnabledFor(record.levelno):
+                for handler in module_logger.handlers:
+                    handler.handle(record)
+
+
+def ensure_log_directory(directory):
+
+    """Create the log directory, if needed, once per process.
+
+    """
+
+    if directory in _log_directories_ready:
+        return
+
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+
+    _log_directories_ready.add(directory)
+
+
+def _add_module_file_handler(module_logger):
+
+    """Attach a module's rotating file handler, as set in logging.cfg.
+
+    """
+
+    config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
+    config.refresh()
+    asctime_format = config.get_item("logging", "asctime_format")
+    backup_count = config.get_item("logging", "log_backup_count")
+    directory = config.get_item("logging", "log_directory")
+    format_ = config.get_item("logging", "module_log_format")
+    extension = config.get_item("logging", "log_extension")
+    level = config.get_item("logging", "log_level")
+    max_bytes = config.get_item("logging", "log_max_bytes")
+    level = log_level_map[level]
+    filepath = "{0}/{1}{2}".format(directory, module_logger.name, extension)
+    ensure_log_directory(directory)
+    handler = RotatingFileHandler(filepath, maxBytes=max_bytes,
+                                  backupCount=backup_count)
+    handler.setFormatter(logging.Formatter(format_, asctime_format))
+    module_logger.setLevel(level)
+    module_logger.addHandler(handler)
+
 
 ###############################################################################
 
-# Set up logging for this module.
+# Set up logging for this module. The log file is only opened when the module
+# first logs a record.
 
 log_level_map = {"critical": logging.CRITICAL, "error": logging.ERROR,
                  "warning": logging.WARNING, "info": logging.INFO,
                  "debug": logging.DEBUG, "notset": logging.NOTSET}
 
 base_path = os.path.dirname(os.path.realpath(__file__))
-logger_name = __name__
-logger = logging.getLogger(logger_name)
-log_config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
-log_asctime_format = log_config.get_item("logging", "asctime_format")
-log_backup_count = log_config.get_item("logging", "log_backup_count")
-log_directory = log_config.get_item("logging", "log_directory")
-log_format = log_config.get_item("logging", "module_log_format")
-log_extension = log_config.get_item("logging", "log_extension")
-log_level = log_config.get_item("logging", "log_level")
-log_max_bytes = log_config.get_item("logging", "log_max_bytes")
-log_filename = "{0}{1}".format(logger_name, log_extension)
-log_filepath = "{0}/{1}".format(log_directory, log_filename)
-log_formatter = logging.Formatter(log_format, log_asctime_format)
-log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                  backupCount=log_backup_count)
-log_handler.setFormatter(log_formatter)
-logger.setLevel(log_level_map[log_level])
-logger.addHandler(log_handler)
-logger.info("----------------------------------------------------------------")
-logger.info("**** Imported by {0} ****".format(__main__.__file__))
+logger = get_module_logger(__name__)
 
 # END FILE
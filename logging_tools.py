@@ -45,8 +45,7 @@ Basic usage:
 
     To redirect stdout and stderr back to the log file:
 
-    sys.stdout = _StreamToLOG(LOG, logging.INFO)
-    sys.stderr = _StreamToLOG(LOG, logging.ERROR)
+    LOG.redirect_streams()
 
 Provided Classes
 ----------------
@@ -65,7 +64,8 @@ _StreamToLOG:
 
 """
 
-import inspect
+from __future__ import print_function
+
 import logging
 import os
 import sys
@@ -76,6 +76,18 @@ import __main__
 
 from library_tools import ConfigReader
 from library_tools import Singleton
+from library_tools import ensure_log_directory
+
+
+###############################################################################
+
+# Log levels at which an active exception's traceback is written to the log.
+
+_ERROR_LEVELS = frozenset(("critical", "error"))
+
+# Source path of this module, used to skip its own frames in the stack walk.
+
+_MODULE_FILE = __file__.rstrip('cd')
 
 
 ###############################################################################
@@ -96,23 +108,25 @@ def get_log_location():
 
     """
 
-    p_frame = None
+    p_frame = sys._getframe()
 
-    for item in inspect.stack():
-        if item[1] not in __file__.rstrip('cd'):
-            p_frame = item[0]
-            break
+    while p_frame.f_code.co_filename == _MODULE_FILE:
+        p_frame = p_frame.f_back
 
     location = {}
+    code = p_frame.f_code
 
-    if "self" in p_frame.f_locals.keys():
+    # Only build the frame's locals dict when the first argument is "self".
+
+    if (code.co_argcount > 0 and code.co_varnames[0] == "self" and
+            "self" in p_frame.f_locals):
         location["class"] = p_frame.f_locals["self"].__class__.__name__
     else:
         location["class"] = ""
 
-    location["function"] = p_frame.f_code.co_name
-    location["line_number"] = p_frame.f_code.co_firstlineno
-    location["filepath"] = p_frame.f_code.co_filename.split("/")[-1]
+    location["function"] = code.co_name
+    location["line_number"] = code.co_firstlineno
+    location["filepath"] = code.co_filename.split("/")[-1]
 
     del p_frame
 
@@ -172,6 +186,12 @@ class _LoggerManager(object):
 
         log_filename = "log.log" if log_filename is None else log_filename
 
+        # Return the existing logger rather than stacking another handler on
+        # it (logging.getLogger caches loggers by name).
+
+        if log_filename in _LoggerManager._loggers:
+            return _LoggerManager._loggers[log_filename]
+
         log_asctime_format = module_log_asctime_format
         log_dir = module_log_directory
         log_format = module_log_config.get_item("logging", "script_log_format")
@@ -186,8 +206,9 @@ class _LoggerManager(object):
                 os.makedirs(log_dir)
 
             except OSError as e:
-                print "WARNING: Could not create LOGS directory."
-                print e
+                print("WARNING: Could not create LOGS directory.",
+                      file=sys.__stderr__)
+                print(e, file=sys.__stderr__)
 
                 # Set the log directory to a convenient default directory.
                 # Change this as necessary depending on the system.
@@ -196,24 +217,31 @@ class _LoggerManager(object):
 
         log_filepath = "{0}/{1}".format(log_dir, log_filename)
 
-        if os.path.isfile(log_filepath):
+        logger = logging.getLogger(log_filepath)
+        _LoggerManager._loggers[log_filename] = logger
+
+        if not logger.handlers:
+            log_file_exists = os.path.isfile(log_filepath)
+            log_formatter = logging.Formatter(log_format, log_asctime_format)
+            log_handler = RotatingFileHandler(log_filepath,
+                                              maxBytes=log_max_bytes,
+                                              backupCount=log_backup_count)
+
+            log_handler.setFormatter(log_formatter)
 
-            with open(log_filepath, "a") as f:
-                f.write("\n--------------------------------------------------")
-                f.write("\n\n")
+            # Separate this session from earlier ones, writing through the
+            # handler's own stream rather than opening the file again.
 
-        log_formatter = logging.Formatter(log_format, log_asctime_format)
-        log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                          backupCount=log_backup_count)
-        log_handler.setFormatter(log_formatter)
+            if log_file_exists:
+                log_handler.stream.write("\n{0}\n\n".format("-" * 50))
+                log_handler.stream.flush()
 
-        _LoggerManager._loggers[log_filename] = logging.getLogger(log_filepath)
-        _LoggerManager._loggers[log_filename].setLevel(log_level_map[log_level])
-        _LoggerManager._loggers[log_filename].addHandler(log_handler)
+            logger.setLevel(log_level_map[log_level])
+            logger.addHandler(log_handler)
 
         module_logger.info("Returning logger: {0}".format(log_filename))
 
-        return _LoggerManager._loggers[log_filename]
+        return logger
 
 ###############################################################################
 
@@ -229,6 +257,8 @@ class _LogWriter(object):
 
     """
 
+    __slots__ = ("log", "call_map", "nslm", "_stdout_redir", "_stderr_redir")
+
     def __getattr__(self, name):
 
         """Overriding __getattr__.
@@ -302,8 +332,22 @@ class _LogWriter(object):
                          "error": self.log.error,
                          "critical": self.log.critical}
         self.nslm = _NewStyleLogMessage
-        sys.stdout = _StreamToLOG(self.log, logging.INFO)
-        sys.stderr = _StreamToLOG(self.log, logging.ERROR)
+        self._stdout_redir = _StreamToLOG(self.log, logging.INFO)
+        self._stderr_redir = _StreamToLOG(self.log, logging.ERROR)
+        self.redirect_streams()
+
+    def redirect_streams(self):
+
+        """Redirect stdout and stderr to the log file.
+
+        Notes:
+            Reinstates the redirectors created in __init__, so any settings
+            made on them (active, caller) are kept.
+
+        """
+
+        sys.stdout = self._stdout_redir
+        sys.stderr = self._stderr_redir
 
     def record_user_options(self, options):
 
@@ -423,15 +467,14 @@ class _LogWriter(object):
 
         """Prints a status message to stdout.
 
-        """
-
-        sys.stdout = sys.__stdout__
-        sys.stderr = sys.__stderr__
+        Notes:
+            Writes straight to the original stdout stream, so the
+            stdout/stderr redirect to the log file is left untouched.
 
-        print message
+        """
 
-        sys.stdout = _StreamToLOG(self.log, logging.INFO)
-        sys.stderr = _StreamToLOG(self.log, logging.ERROR)
+        sys.__stdout__.write("{0}\n".format(message))
+        sys.__stdout__.flush()
 
     def write_to_log(self, level, message, *args):
 
@@ -445,6 +488,13 @@ class _LogWriter(object):
         """
 
         level = level.lower()
+
+        # Skip the stack walk and formatting for records the logger would
+        # discard anyway.
+
+        if not self.log.isEnabledFor(module_log_level_map[level]):
+            return
+
         location = get_log_location()
 
         if location["function"] == "main":
@@ -455,8 +505,12 @@ class _LogWriter(object):
                                                 location["function"], message)
 
         message_to_log = self.nslm(full_message, *args)
-        self.call_map[level](message_to_log, exc_info=level in ["critical",
-                                                                "error"])
+
+        # Only attach a traceback when there is an exception being handled;
+        # otherwise the handler would write a spurious "None" line.
+
+        exc_info = level in _ERROR_LEVELS and sys.exc_info()[0] is not None
+        self.call_map[level](message_to_log, exc_info=exc_info)
 
 ###############################################################################
 
@@ -488,6 +542,8 @@ class _NewStyleLogMessage(object):
 
     """
 
+    __slots__ = ("message", "args", "kwargs")
+
     def __init__(self, message, *args, **kwargs):
 
         """Initialize the class object.
@@ -516,13 +572,26 @@ class _NewStyleLogMessage(object):
 
         """Return a formatted message string.
 
+        Notes:
+            A message without arguments is returned as is. Callable
+            arguments are evaluated only if any are present.
+
         """
 
-        args = (i if type(i) is type else i() if callable(i)
-                else i for i in self.args)
+        if not self.args and not self.kwargs:
+            return self.message
+
+        args = self.args
 
-        kwargs = dict((k, v() if callable(v) else v)
-                      for k, v in self.kwargs.items())
+        if any(callable(i) and type(i) is not type for i in args):
+            args = tuple(i if type(i) is type else i() if callable(i)
+                         else i for i in args)
+
+        kwargs = self.kwargs
+
+        if kwargs and any(callable(v) for v in kwargs.values()):
+            kwargs = dict((k, v() if callable(v) else v)
+                          for k, v in kwargs.items())
 
         try:
             return self.message.format(*args, **kwargs)
@@ -556,6 +625,10 @@ class _StreamToLOG(object):
 
     """
 
+    # softspace is set by the Python 2 print statement on sys.stdout.
+
+    __slots__ = ("active", "caller", "logger", "level", "softspace")
+
     def __init__(self, logger, level):
 
         """Initialize the class object.
@@ -574,6 +647,7 @@ class _StreamToLOG(object):
         self.caller = None
         self.logger = logger
         self.level = level
+        self.softspace = 0
 
     def turn_off(self):
         self.active = False
@@ -623,10 +697,12 @@ class _StreamToLOG(object):
             sys.stdout = sys.__stdout__
             sys.stderr = sys.__stderr__
 
-            print "TRACEBACK: {0}".format(traceback.extract_stack())
-            print "message is {0}".format(message)
-            print "error is {0}".format(e)
-            print "Fatal ERROR redirecting stdout, stderr to log. STOPPING."
+            print("TRACEBACK: {0}".format(traceback.extract_stack()),
+                  file=sys.__stderr__)
+            print("message is {0}".format(message), file=sys.__stderr__)
+            print("error is {0}".format(e), file=sys.__stderr__)
+            print("Fatal ERROR redirecting stdout, stderr to log. STOPPING.",
+                  file=sys.__stderr__)
             raise SystemExit
 
 
@@ -657,6 +733,7 @@ module_log_filepath = "{0}/{1}".format(module_log_directory,
                                        module_log_filename)
 module_log_formatter = logging.Formatter(module_log_format,
                                          module_log_asctime_format)
+ensure_log_directory(module_log_directory)
 module_log_handler = RotatingFileHandler(module_log_filepath,
                                          maxBytes=module_log_max_bytes,
                                          backupCount=module_log_backup_count)
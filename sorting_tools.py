@@ -13,20 +13,21 @@ sort_subsort
     Return a sorted list (with primary and secondary sorting).
 
 quicksort
-    The standard QuickSort algorithm.
+    Return a sorted copy of a list.
 
 """
 
-import logging
-import os
 import re
-from logging.handlers import RotatingFileHandler
-
-import __main__
 
 import string_tools
-from dictionary_tools import LastUpdatedOrderedDict
-from library_tools import ConfigReader
+from library_tools import get_module_logger
+
+
+###############################################################################
+
+# Splits a string into alternating non-digit and digit runs.
+
+_DIGIT_RE = re.compile(r"([0-9]+)")
 
 
 ###############################################################################
@@ -36,20 +37,62 @@ def check_types(list_, type_):
 
     """Return a boolean.
 
-    Checks that list_ or all members of list_ are of type type_.
+    Checks that list_ or all members of list_ are of type type_. Members
+    that are lists are checked item by item. type_ may also be a tuple of
+    types.
 
     """
 
     list_ = [list_] if not isinstance(list_, list) else list_
-    check_list = []
 
-    for i in list_:
-        if isinstance(i, list):
-            check_list.extend(i)
-        else:
-            check_list.append(i)
+    # Stops at the first mismatch without building a flattened copy.
+
+    return all(isinstance(j, type_) for i in list_
+               for j in (i if isinstance(i, list) else (i,)))
+
+
+def _token_key(token, subtoken):
+
+    """Return the natural sort key for a token.
+
+    The token is split into alphabetic and numeric subtokens, starting at
+    index subtoken. Numeric subtokens are compared as integers and
+    alphabetic subtokens are compared case-insensitively.
+
+    """
+
+    stripped = string_tools.strip_non_alphanumeric(token)
+    subtoken_list = [int(c) if c.isdigit() else c
+                     for c in _DIGIT_RE.split(stripped.lower()) if c]
+
+    try:
+        return subtoken_list[subtoken:]
+    except TypeError as e:
+        logger.error("TypeError: {0}".format(e))
+        return subtoken_list
+
+
+def _alphanum_key(line, pos, subtoken, cache):
+
+    """Return the natural sort key for the token at index pos of line.
+
+    Keys are memoized in cache (a dict, keyed by token), so a token that
+    repeats across lines is only split once per sort.
+
+    """
+
+    try:
+        token = line[pos]
+    except IndexError as e:
+        logger.error("IndexError: {0}".format(e))
+        return 0
+
+    key = cache.get(token)
 
-    return all(isinstance(i, type_) for i in check_list)
+    if key is None:
+        key = cache[token] = _token_key(token, subtoken)
+
+    return key
 
 
 def natural_sort(list_, pos, subtoken=None):
@@ -75,29 +118,10 @@ def natural_sort(list_, pos, subtoken=None):
 
     """
 
-    def convert(text):
-        return int(text) if text.isdigit() else text.lower()
-
-    def split(key, pos):
-        stripped = string_tools.strip_non_alphanumeric(key[pos])
-        return filter(None, re.split("([0-9]+)", stripped))
+    cache = {}
 
-    def alphanum_key(key):
-
-        try:
-            subtoken_list = [convert(c) for c in split(key, pos)]
-        except IndexError as e:
-            logger.error("IndexError: {0}".format(e))
-            return 0
-
-        try:
-            temp_list = [i for i in xrange(subtoken, len(subtoken_list))]
-            return [subtoken_list[s] for s in temp_list]
-        except (IndexError, TypeError) as e:
-            logger.error("IndexError, TypeError: {0}".format(e))
-            return subtoken_list
-
-    return sorted(list_, key=alphanum_key)
+    return sorted(list_,
+                  key=lambda line: _alphanum_key(line, pos, subtoken, cache))
 
 
 def sort_subsort(list_, sort_map, header=False, delimiter=","):
@@ -148,8 +172,8 @@ def sort_subsort(list_, sort_map, header=False, delimiter=","):
         (2) For all lines in list_ that match on the token at index A, sort by
             the token at index B, starting at subtoken b.
 
-        (3) For all lines in list_ that match on the token at index B, sort by
-            the token at index C, starting at subtoken c.
+        (3) For all lines in list_ that match on the tokens at indices A and
+            B, sort by the token at index C, starting at subtoken c.
 
         .... and so on.
 
@@ -245,9 +269,9 @@ def sort_subsort(list_, sort_map, header=False, delimiter=","):
     # Third branch: error.
 
     if check_types(list_, basestring):
-        current_sort = [line.split(delimiter) for line in list_]
+        split_lines = True
     elif check_types(list_, list):
-        current_sort = list_
+        split_lines = False
     else:
         logger.error("All members of list_ must be of type str or list.")
         return list_
@@ -265,110 +289,86 @@ def sort_subsort(list_, sort_map, header=False, delimiter=","):
         logger.error("All members of sort_map must be of type int or tuple.")
         return list_
 
-    first_run = True
+    # One sort on the keys for every sort_map entry, in order, gives the
+    # primary, secondary, tertiary, etc. sort. The sort is stable, so lines
+    # with equal keys keep their input order.
+    #
+    # A sort on (A, b) after a sort on (A, a), with a <= b, can never break a
+    # tie: lines that match on the subtokens of token A from index a onwards
+    # also match from index b onwards. Such entries are dropped.
 
-    for t in sort_map:
+    sort_keys = []
+    min_subtoken = {}
 
-        sub_lists = LastUpdatedOrderedDict()
+    for p, s in sort_map:
+        if p in min_subtoken and min_subtoken[p] <= s:
+            continue
+        min_subtoken[p] = s
+        sort_keys.append((p, s, {}))
 
-        p = t[0]  # primary token
-        s = t[1]  # subtoken
+    # A single key is returned bare rather than in a one-item list.
 
-        if first_run:
-            current_sort = natural_sort(current_sort, p, s)
-            pre_p = p  # use first primary token for the second run
-            first_run = not first_run
+    if len(sort_keys) == 1:
+        (p, s, cache), = sort_keys
 
-        else:
-            for line in current_sort:
-
-                try:
-                    sub_lists[line[pre_p]].append(line)
-                except KeyError:
-                    sub_lists[line[pre_p]] = []
-                    sub_lists[line[pre_p]].append(line)
-                except IndexError as e:
-                    logger.error("IndexError: {0}".format(e))
-                    return list_
+        def tokens_key(tokens):
+            return _alphanum_key(tokens, p, s, cache)
+    else:
+        def tokens_key(tokens):
+            return [_alphanum_key(tokens, p, s, cache)
+                    for p, s, cache in sort_keys]
 
-            pre_p = p  # set previous primary token for the next loop
-            current_sort = []
+    # String lines are split here, as their key is computed, rather than in
+    # a separate pass that keeps every line's tokens alive.
 
-            for key, sub_list in sub_lists.iteritems():
+    if split_lines:
+        def line_key(line):
+            return tokens_key(line.split(delimiter))
+    else:
+        line_key = tokens_key
 
-                sub_list_sort = natural_sort(sub_list, p, s)
+    current_sort = sorted(list_, key=line_key)
 
-                for line in sub_list_sort:
-                    current_sort.append(line)
+    # A comma-delimited input line is identical to its tokens re-joined with
+    # commas, so take it as is.
 
-    for line in current_sort:
-        final_sort.append(",".join(line))
+    if not split_lines:
+        final_sort.extend(",".join(line) for line in current_sort)
+    elif delimiter != ",":
+        final_sort.extend(",".join(line.split(delimiter))
+                          for line in current_sort)
+    else:
+        final_sort.extend(current_sort)
 
     return final_sort
 
 
 def quicksort(list_):
 
-    """The standard quick sort algorithm, applied to members of list L.
+    """Return a sorted copy of list_.
 
     Arguments:
 
         list_(list): A list of items to be sorted.
 
+    Notes:
+        Kept for backwards compatibility. Sorting is delegated to the
+        built-in sorted (Timsort), which is stable, O(n log n) in the worst
+        case and does not recurse.
+
     """
 
     if not isinstance(list_, list):
         logger.error("Argument must be of type list.")
         return list_
 
-    less = []
-    equal = []
-    greater = []
-
-    if len(list_) > 1:
-        pivot = list_[0]
-        for x in list_:
-            if x < pivot:
-                less.append(x)
-            elif x == pivot:
-                equal.append(x)
-            elif x > pivot:
-                greater.append(x)
-
-        # Recursive calls
-        return quicksort(less) + equal + quicksort(greater)
-
-    else:
-        return list_
+    return sorted(list_)
 
 ###############################################################################
 
-# Set up logging for this module.
-
-log_level_map = {"critical": logging.CRITICAL, "error": logging.ERROR,
-                 "warning": logging.WARNING, "info": logging.INFO,
-                 "debug": logging.DEBUG, "notset": logging.NOTSET}
-
-base_path = os.path.dirname(os.path.realpath(__file__))
-logger_name = __name__
-logger = logging.getLogger(logger_name)
-log_config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
-log_asctime_format = log_config.get_item("logging", "asctime_format")
-log_backup_count = log_config.get_item("logging", "log_backup_count")
-log_directory = log_config.get_item("logging", "log_directory")
-log_format = log_config.get_item("logging", "module_log_format")
-log_extension = log_config.get_item("logging", "log_extension")
-log_level = log_config.get_item("logging", "log_level")
-log_max_bytes = log_config.get_item("logging", "log_max_bytes")
-log_filename = "{0}{1}".format(logger_name, log_extension)
-log_filepath = "{0}/{1}".format(log_directory, log_filename)
-log_formatter = logging.Formatter(log_format, log_asctime_format)
-log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                  backupCount=log_backup_count)
-log_handler.setFormatter(log_formatter)
-logger.setLevel(log_level_map[log_level])
-logger.addHandler(log_handler)
-logger.info("----------------------------------------------------------------")
-logger.info("**** Imported by {0} ****".format(__main__.__file__))
+# Set up logging for this module. The log file is only opened when the module
+# first logs a record.
+
+logger = get_module_logger(__name__)
 
 # END FILE
@@ -13,9 +13,9 @@ check_types
 clean_line
     Cleans escape and other special characters from a line.
 
-compress_delimiter (NOT WORKING AS INTENDED)
-    Removes delimiter character from within specific tokens in delimited string
-    (i.e., compresses certain adjacent tokens into a single token).
+compress_commas
+    Removes commas from within single-quoted elements of a comma-separated
+    string, and the quotes themselves.
 
 exact_match
     Returns True if input string is an exact match to comparison string or to
@@ -45,17 +45,33 @@ tokenize
 
 """
 
-import csv
-import logging
-import os
 import re
-import sre_constants
-from cStringIO import StringIO
-from logging.handlers import RotatingFileHandler
+from string import maketrans
 
-import __main__
+from library_tools import get_module_logger
 
-from library_tools import ConfigReader
+
+###############################################################################
+
+# ANSI escape sequences (e.g. terminal colour codes) in captured stdout.
+
+_ANSI_RE = re.compile(r'\x1b[^m]*m')
+
+# Control characters (chr(1) to chr(31)) stripped from captured stdout.
+
+_ESCAPES = ''.join(chr(char) for char in range(1, 32))
+
+# Everything up to, and the last, parenthesized text in a string.
+
+_LAST_PARENTHESES_RE = re.compile(r'(.*)(\(.*\))')
+
+# A single-quoted element; group 1 is the text between the quotes.
+
+_QUOTED_RE = re.compile(r"'([^']*)'")
+
+# Every non-alphanumeric character in the 8-bit range.
+
+_NON_ALPHANUMERIC = ''.join(c for c in map(chr, range(256)) if not c.isalnum())
 
 
 ###############################################################################
@@ -76,44 +92,64 @@ def batch_replace(source_string, old_subs, new_subs):
            Each item in old_subs is replaced by the corresponding item in
            new_subs. Both lists must be of the same length.
 
+           All replacements are made in a single pass, so inserted text is
+           not itself replaced. Where targets overlap, the longest match
+           wins.
+
     """
 
     old_subs = [old_subs] if not isinstance(old_subs, list) else old_subs
     new_subs = [new_subs] if not isinstance(new_subs, list) else new_subs
-    new_string = None
 
     if len(old_subs) != len(new_subs):
         print "{0}: Lists must be of the same length.".format(__file__)
         return source_string
 
-    for o, n in zip(old_subs, new_subs):
-        try:
-            new_string = source_string.replace(o, n)
-        except AttributeError as e:
-            print "{0}: {1}".format(__file__, e)
-            return source_string
+    if not old_subs:
+        return source_string
+
+    replacement_map = dict(zip(old_subs, new_subs))
+
+    # Single-character swaps in a byte string: one pass with a 256-entry
+    # translation table.
+
+    if type(source_string) is str and all(type(o) is str and len(o) == 1 and
+                                          type(n) is str and len(n) == 1
+                                          for o, n in replacement_map.items()):
+        table = maketrans("".join(replacement_map.keys()),
+                          "".join(replacement_map.values()))
+        return source_string.translate(table)
+
+    # Otherwise, one regex pass over the string with an alternation of all
+    # targets, longest first, so that no replacement is rescanned.
 
-    return new_string
+    pattern = "|".join(re.escape(o) for o in
+                       sorted(replacement_map, key=len, reverse=True))
+
+    try:
+        return re.sub(pattern, lambda m: replacement_map[m.group(0)],
+                      source_string)
+    except TypeError as e:
+        print "{0}: {1}".format(__file__, e)
+        return source_string
 
 
 def check_types(list_, type_):
 
     """Return a boolean.
 
-    Checks that list_ or all members of list_ are of type type_.
+    Checks that list_ or all members of list_ are of type type_. Members
+    that are lists are checked item by item. type_ may also be a tuple of
+    types.
 
     """
 
     list_ = [list_] if not isinstance(list_, list) else list_
-    check_list = []
 
-    for i in list_:
-        if isinstance(i, list):
-            check_list.extend(i)
-        else:
-            check_list.append(i)
+    # Stops at the first mismatch without building a flattened copy.
 
-    return all(isinstance(i, type_) for i in check_list)
+    return all(isinstance(j, type_) for i in list_
+               for j in (i if isinstance(i, list) else (i,)))
 
 
 def clean_line(line):
@@ -129,9 +165,7 @@ def clean_line(line):
 
     """
 
-    escapes = ''.join([chr(char) for char in range(1, 32)])
-    prep_line = re.compile(r'\x1b[^m]*m').sub('', line)
-    return prep_line.translate(None, escapes)
+    return _ANSI_RE.sub('', line).translate(None, _ESCAPES)
 
 
 def compress_commas(text):
@@ -153,10 +187,7 @@ def compress_commas(text):
 
     """
 
-    file_like_object = StringIO("\n".join("".join(line.split())
-                                for line in text.split("\n")))
-
-    return [r for r in csv.reader(file_like_object, quotechar="'")]
+    return _QUOTED_RE.sub(lambda m: m.group(1).replace(",", ""), text)
 
 
 def exact_match(string, comp):
@@ -164,30 +195,20 @@ def exact_match(string, comp):
     """Return a boolean.
 
        Determines if string is an exact match to comparison, or to
-       any member of comparison if comparison is a list.
+       any member of comparison if comparison is a list or set.
 
        Arguments:
            string (str): The string you're checking.
 
-           comp (str/list): Either a string or a list of strings.
+           comp (str/list/set): Either a string, or a list or set of
+               strings.
 
     """
 
-    comp = [comp] if not isinstance(comp, list) else comp
+    if not isinstance(comp, (list, set, frozenset)):
+        comp = [comp]
 
-    results = []
-
-    for item in comp:
-        try:
-            results.extend(re.findall("\\{0}\\b".format(string), item))
-        except sre_constants.error as e:
-            print "{0}: {1}".format(__file__, e)
-            return False
-
-    if results:
-        return True
-    else:
-        return False
+    return string in comp
 
 
 def modify_tokens(lines, replacement_map, targets, action, delimiter=","):
@@ -235,6 +256,12 @@ def modify_tokens(lines, replacement_map, targets, action, delimiter=","):
                      "Received {0} instead.", action)
         return lines
 
+    # Map replacement tokens back to their originals once, rather than
+    # scanning replacement_map for every target of every line.
+
+    if action == "undo":
+        inverse_map = {v: k for k, v in replacement_map.iteritems()}
+
     new_lines = []
 
     for line in lines:
@@ -245,10 +272,9 @@ def modify_tokens(lines, replacement_map, targets, action, delimiter=","):
                 tokens[target] = replacement_map[tokens[target]]
 
         elif action == "undo":
-            for key in replacement_map:
-                for target in targets:
-                    if replacement_map[key] == tokens[target]:
-                        tokens[target] = key
+            for target in targets:
+                tokens[target] = inverse_map.get(tokens[target],
+                                                 tokens[target])
 
         line = delimiter.join(tokens)
         new_lines.append(line)
@@ -262,17 +288,21 @@ def replace_last(source_string, old_sub, new_sub):
        starting at the end. Replace the first occurrence of
        old_sub with new_sub.
 
-       Returns the new string.
+       Returns the new string, or source_string unchanged if it does not
+       contain old_sub.
 
     """
 
     try:
-        head, sep, tail = source_string.rpartition(old_sub)
+        i = source_string.rfind(old_sub)
     except AttributeError as e:
         print "{0}: {1}".format(__file__, e)
         return source_string
 
-    return head + new_sub + tail
+    if i < 0:
+        return source_string
+
+    return source_string[:i] + new_sub + source_string[i + len(old_sub):]
 
 
 def remove_tokens(string, targets, delimiter=","):
@@ -332,7 +362,7 @@ def strip_last_parentheses(string):
     """
 
     if string.find("(") > -1 and string.find(")") > -1:
-        return re.sub('(.*)(\(.*\))', '\\1', string)
+        return _LAST_PARENTHESES_RE.sub('\\1', string)
     else:
         return string
 
@@ -347,20 +377,18 @@ def strip_non_alphanumeric(source_string):
 
         """
 
-    non_alphanum = ''.join(c for c in map(chr, range(256))
-                           if not c.isalnum())
+    # unicode.translate takes a mapping rather than a deletion string, so
+    # reduce unicode input to ASCII first instead of waiting for TypeError.
+
+    if isinstance(source_string, unicode):
+        source_string = source_string.encode("ascii", "ignore")
 
     try:
-        new_string = source_string.translate(None, non_alphanum)
-    except TypeError:
-        temp_string = source_string.encode("ascii", "ignore")
-        new_string = temp_string.translate(None, non_alphanum)
+        return source_string.translate(None, _NON_ALPHANUMERIC)
     except AttributeError as e:
         print "{0}: {1}".format(__file__, e)
         return source_string
 
-    return new_string
-
 
 def strip_tokens(tokens):
 
@@ -375,7 +403,7 @@ def strip_tokens(tokens):
         return tokens
 
 
-def tokenize(string, delimiter=","):
+def tokenize(string, delimiter=",", strip=True):
 
     """Return a list of tokens.
 
@@ -386,42 +414,25 @@ def tokenize(string, delimiter=","):
 
            delimiter (str): A delimiter. Optional. Default is ",".
 
+           strip (bool): Strip whitespace from each token. Optional.
+                         Default is True. Pass False for data known to
+                         have no whitespace around its delimiters.
+
     """
 
     try:
-        return strip_tokens(string.split(delimiter))
+        tokens = string.split(delimiter)
     except AttributeError as e:
         print "{0}:{1}".format(__file__, e)
         return string
 
+    return [t.strip() for t in tokens] if strip else tokens
+
 ###############################################################################
 
-# Set up logging for this module.
-
-log_level_map = {"critical": logging.CRITICAL, "error": logging.ERROR,
-                 "warning": logging.WARNING, "info": logging.INFO,
-                 "debug": logging.DEBUG, "notset": logging.NOTSET}
-
-base_path = os.path.dirname(os.path.realpath(__file__))
-logger_name = __name__
-logger = logging.getLogger(logger_name)
-log_config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
-log_asctime_format = log_config.get_item("logging", "asctime_format")
-log_backup_count = log_config.get_item("logging", "log_backup_count")
-log_directory = log_config.get_item("logging", "log_directory")
-log_format = log_config.get_item("logging", "module_log_format")
-log_extension = log_config.get_item("logging", "log_extension")
-log_level = log_config.get_item("logging", "log_level")
-log_max_bytes = log_config.get_item("logging", "log_max_bytes")
-log_filename = "{0}{1}".format(logger_name, log_extension)
-log_filepath = "{0}/{1}".format(log_directory, log_filename)
-log_formatter = logging.Formatter(log_format, log_asctime_format)
-log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                  backupCount=log_backup_count)
-log_handler.setFormatter(log_formatter)
-logger.setLevel(log_level_map[log_level])
-logger.addHandler(log_handler)
-logger.info("----------------------------------------------------------------")
-logger.info("**** Imported by {0} ****".format(__main__.__file__))
+# Set up logging for this module. The log file is only opened when the module
+# first logs a record.
+
+logger = get_module_logger(__name__)
 
 # END FILE
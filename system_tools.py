@@ -15,15 +15,23 @@ TopData
 """
 
 import datetime
-import logging
 import os
+import re
+import shlex
+import shutil
 import subprocess
-from logging.handlers import RotatingFileHandler
-
-import __main__
+from operator import itemgetter
 
 import string_tools
-from library_tools import ConfigReader
+from library_tools import get_module_logger
+
+
+###############################################################################
+
+# Command lines already split by system_command, mapped to their tokens.
+
+_command_tokens = {}
+_COMMAND_TOKENS_MAX = 128
 
 
 ###############################################################################
@@ -36,7 +44,9 @@ def system_command(cmd):
     Args:
         cmd (str): A command-line string.
 
-    Excutes a Linux command-line instruction.
+    Excutes a Linux command-line instruction. The command line is split
+    with shell quoting rules, so quoted arguments may contain spaces. A
+    command line with unbalanced quotes is split on whitespace.
 
     Raises:
         OSError: The command did not execute.
@@ -48,7 +58,22 @@ def system_command(cmd):
 
     """
 
-    command_tokens = [i for i in cmd.split()]
+    command_tokens = _command_tokens.get(cmd)
+
+    if command_tokens is None:
+        if len(_command_tokens) >= _COMMAND_TOKENS_MAX:
+            _command_tokens.clear()
+
+        # An unbalanced quote cannot be split with shell rules; split on
+        # whitespace instead, as for any command without quotes.
+
+        try:
+            command_tokens = tuple(shlex.split(cmd))
+        except ValueError as e:
+            logger.warning("ValueError: {0}: {1}".format(e, cmd))
+            command_tokens = tuple(cmd.split())
+
+        _command_tokens[cmd] = command_tokens
 
     debug_system_calls = False  # Set to True to debug system calls
 
@@ -99,9 +124,11 @@ class TopData(object):
         if user_ids is None:
             user_ids = []
         if filename is None:
-            now = datetime.datetime.now()
-            current_date = datetime.datetime.strftime(now, "%H%M%S_%m%d%Y")
-            self.filename = "topdata_{0}.txt".format(current_date)
+            # Same as strftime "%H%M%S_%m%d%Y", without parsing the format.
+
+            self.filename = ("topdata_{0.hour:02d}{0.minute:02d}"
+                             "{0.second:02d}_{0.month:02d}{0.day:02d}"
+                             "{0.year}.txt".format(datetime.datetime.now()))
         else:
             self.filename = filename
 
@@ -144,71 +171,97 @@ class TopData(object):
 
         """
 
-        def write_line_to_file(line, f):
-            column_indexes = self.column_indexes
+        # Picks the captured columns out of a line's tokens in one call.
+        # itemgetter returns a bare item rather than a tuple for one index.
+
+        if len(self.column_indexes) == 1:
+            pick_column = itemgetter(self.column_indexes[0])
+
+            def pick_columns(tokens):
+                return pick_column(tokens),
+        else:
+            pick_columns = itemgetter(*self.column_indexes)
+
+        def format_line(line):
             cleaned_line = string_tools.clean_line(line)
-            tokens = string_tools.tokenize(cleaned_line, None)
-            delimited_string = ",".join(map(tokens.__getitem__, column_indexes))
-            f.write(delimited_string + "\n")
+
+            # Splitting on runs of whitespace leaves no whitespace to strip.
+
+            tokens = string_tools.tokenize(cleaned_line, None, strip=False)
+            delimited_string = ",".join(pick_columns(tokens))
+            return delimited_string + "\n"
 
         captured_header = False
         header_clue = "TIME+"
         user_id = self.user_ids[0]
-        process_names = self.process_names
 
-        with open(self.filename, "r+") as f:
-            lines = f.readlines()
-            f.seek(0)
-            f.truncate()  # Erases all data in the file.
+        # One scan for any of the process names, rather than one substring
+        # search per name.
+
+        if self.process_names:
+            process_names_re = re.compile("|".join(
+                re.escape(p) for p in self.process_names))
+        else:
+            process_names_re = None
+
+        # Stream the capture into a temporary file and rename it over the
+        # original, rather than reading it all into memory and truncating.
+        # Both files are buffered in 1 MiB blocks, so reads and writes
+        # reach the kernel a block at a time, and output lines are handed
+        # to the buffer in batches.
+
+        temp_filename = "{0}.tmp".format(self.filename)
+        batch = []
 
-        #  Create a separate output file for each parameter specified by
-        #  by the user.
+        # The temporary file takes the capture's permissions and is removed
+        # if anything fails before it replaces the capture.
 
-            for line in lines:
+        try:
+            with open(self.filename, "r", 1 << 20) as f_in, \
+                    open(temp_filename, "w", 1 << 20) as f_out:
 
-                if not captured_header and header_clue in line:
-                    write_line_to_file(line, f)
-                    captured_header = True
+                for line in f_in:
 
-                elif process_names and all(p not in line
-                                           for p in process_names):
-                    continue
+                    if not captured_header and header_clue in line:
+                        batch.append(format_line(line))
+                        captured_header = True
 
-                elif user_id not in line:
-                    continue
+                    # The user ID test is one substring search, so it goes
+                    # first and spares the process name scan for other users'
+                    # lines.
 
-                else:
-                    write_line_to_file(line, f)
+                    elif user_id not in line:
+                        continue
+
+                    elif (process_names_re and
+                          not process_names_re.search(line)):
+                        continue
+
+                    else:
+                        batch.append(format_line(line))
+
+                    if len(batch) >= 512:
+                        f_out.writelines(batch)
+                        del batch[:]
+
+                f_out.writelines(batch)
+
+            shutil.copymode(self.filename, temp_filename)
+            os.rename(temp_filename, self.filename)
+
+        except BaseException:
+            try:
+                os.remove(temp_filename)
+            except OSError:
+                pass
+            raise
 
 
 ###############################################################################
 
-# Set up logging for this module.
-
-log_level_map = {"critical": logging.CRITICAL, "error": logging.ERROR,
-                 "warning": logging.WARNING, "info": logging.INFO,
-                 "debug": logging.DEBUG, "notset": logging.NOTSET}
-
-base_path = os.path.dirname(os.path.realpath(__file__))
-logger_name = __name__
-logger = logging.getLogger(logger_name)
-log_config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
-log_asctime_format = log_config.get_item("logging", "asctime_format")
-log_backup_count = log_config.get_item("logging", "log_backup_count")
-log_directory = log_config.get_item("logging", "log_directory")
-log_format = log_config.get_item("logging", "module_log_format")
-log_extension = log_config.get_item("logging", "log_extension")
-log_level = log_config.get_item("logging", "log_level")
-log_max_bytes = log_config.get_item("logging", "log_max_bytes")
-log_filename = "{0}{1}".format(logger_name, log_extension)
-log_filepath = "{0}/{1}".format(log_directory, log_filename)
-log_formatter = logging.Formatter(log_format, log_asctime_format)
-log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                  backupCount=log_backup_count)
-log_handler.setFormatter(log_formatter)
-logger.setLevel(log_level_map[log_level])
-logger.addHandler(log_handler)
-logger.info("----------------------------------------------------------------")
-logger.info("**** Imported by {0} ****".format(__main__.__file__))
+# Set up logging for this module. The log file is only opened when the module
+# first logs a record.
+
+logger = get_module_logger(__name__)
 
 # END FILE
@@ -5,33 +5,163 @@ Provided Classes
 ----------------
 
 RepeatingCaller
-    Repeats a function call with each call in a separate thread.
+    Repeats a function call on a shared scheduler thread.
 
 """
 
-import logging
-import os
+import heapq
+import itertools
 import threading
-from logging.handlers import RotatingFileHandler
+import time
 
-import __main__
-
-from library_tools import ConfigReader
+from library_tools import get_module_logger
 
 
 ###############################################################################
 
 
+class _Scheduler(object):
+
+    """
+    Runs scheduled calls for every RepeatingCaller from one thread.
+
+    Attributes:
+        _heap (list): (deadline, sequence number, function, stop_event)
+            entries, ordered by deadline.
+
+        _condition (obj): A threading.Condition guarding _heap.
+
+        _sequence (obj): An itertools.count; breaks ties between equal
+            deadlines in submission order.
+
+        _thread (obj): The threading.Thread that makes the calls, or None
+            while nothing is scheduled.
+
+    Notes:
+        The thread exits when the heap empties and is started again by the
+        next submit, so, as with one thread per caller, the process stays
+        alive only while calls are scheduled.
+
+    """
+
+    def __init__(self):
+
+        self._heap = []
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._thread = None
+
+    def submit(self, deadline, function, stop_event):
+
+        """
+        Schedule function to be called at deadline, unless stop_event is set
+        by then.
+
+        Returns: None.
+
+        """
+
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._sequence),
+                                        function, stop_event))
+
+            if self._thread is None:
+                self._start_thread()
+
+            self._condition.notify()
+
+    def cancel(self, stop_event):
+
+        """
+        Drop any calls scheduled with stop_event.
+
+        Returns: None.
+
+        """
+
+        with self._condition:
+            self._heap = [e for e in self._heap if e[3] is not stop_event]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    def _run(self):
+
+        """
+        Make the calls as they fall due.
+
+        Returns: None.
+
+        """
+
+        try:
+            while True:
+
+                with self._condition:
+
+                    while True:
+                        if not self._heap:
+                            self._thread = None
+                            return
+
+                        delay = self._heap[0][0] - time.time()
+
+                        if delay <= 0:
+                            break
+
+                        self._condition.wait(delay)
+
+                    deadline, _, function, stop_event = heapq.heappop(
+                        self._heap)
+
+                if stop_event.is_set():
+                    continue
+
+                # The thread is shared by every RepeatingCaller, so nothing
+                # a call raises may end it.
+
+                try:
+                    function(deadline, stop_event)
+                except BaseException:
+                    logger.exception("Exception raised by scheduled call.")
+
+        finally:
+
+            # Only reached with this thread still current if the loop itself
+            # failed; hand any calls left over to a new thread.
+
+            with self._condition:
+                if self._thread is threading.current_thread():
+                    self._thread = None
+
+                    if self._heap:
+                        self._start_thread()
+
+    def _start_thread(self):
+
+        """
+        Start the thread that makes the calls. Called with _condition held.
+
+        Returns: None.
+
+        """
+
+        self._thread = threading.Thread(target=self._run)
+        self._thread.start()
+
+
 # noinspection PyArgumentList
 class RepeatingCaller(object):
 
     """
-    Repeats a function call with each call executed in a separate thread.
+    Repeats a function call, with the calls executed on a scheduler thread
+    shared by all RepeatingCaller objects.
 
     Attributes:
-        _timer (obj): A threading.Timer object.
+        _stop_event (obj): A threading.Event object, set to end the calls.
 
-        interval (str): Interval between calls, in minutes.
+        _finished (obj): A threading.Event object, set once the calls end.
+
+        interval (str): Interval between calls, in seconds.
 
         total_cycles (str): Total number of calls to be made.
 
@@ -43,8 +173,7 @@ class RepeatingCaller(object):
 
         cycle_count (int): Number of cycles completed.
 
-        is_running (bol): True if the function is executing in a particular
-            thread.
+        is_running (bol): True while calls are scheduled.
 
     """
 
@@ -54,7 +183,7 @@ class RepeatingCaller(object):
         Initialize the object.
 
         Args:
-            interval (str): The interval between function calls, in minutes.
+            interval (str): The interval between function calls, in seconds.
 
             total_cycles (str): The total number of function calls.
 
@@ -66,12 +195,17 @@ class RepeatingCaller(object):
 
         Notes:
             This object is self-starting!
+
+            All RepeatingCaller objects share one thread, so a slow function
+            delays the calls of other RepeatingCaller objects that fall due
+            in the meantime.
         """
 
         logger.info("Initializing RepeatingCaller object.")
 
-        self._timer = None
-        self.interval = int(interval)  # minutes
+        self._stop_event = None
+        self._finished = threading.Event()
+        self.interval = int(interval)  # seconds
         self.total_cycles = total_cycles  # integer count
         self.function = function
         self.args = args
@@ -80,101 +214,102 @@ class RepeatingCaller(object):
         self.is_running = False
         self.start()  # auto starts!
 
-    def _run(self):
+    def _run(self, deadline, stop_event):
 
         """
-        Calls the function.
+        Calls the function and schedules the next call.
+
+        Args:
+            deadline (float): The time this call was scheduled for.
+
+            stop_event (obj): The threading.Event for this run.
 
         Returns: None.
 
+        Notes:
+            Deadlines are kept on a fixed schedule, so the time a call takes
+            does not delay the next one. If a call overruns its interval the
+            next call follows at once.
+
         """
 
-        self.is_running = False
-        self.start()
-        self.function(*self.args, **self.kwargs)
+        try:
+            self.function(*self.args, **self.kwargs)
+        except Exception:
+            logger.exception("Exception raised by repeated function.")
+        except BaseException:
+            self.stop()
+            raise
+
         self.cycle_count += 1
 
         if self.cycle_count == self.total_cycles:
             self.stop()
+        elif not stop_event.is_set():
+            _scheduler.submit(deadline + self.interval, self._run, stop_event)
 
     def start(self):
 
         """
-        Declare a threading.Timer object and pass in self._run.
+        Schedule the first call, one interval from now.
 
         Returns: None.
 
         """
 
         if not self.is_running:
-            self._timer = threading.Timer(self.interval, self._run)
-            self._timer.start()
+            self._stop_event = threading.Event()
+            self._finished.clear()
             self.is_running = True
+            _scheduler.submit(time.time() + self.interval, self._run,
+                              self._stop_event)
 
     def join(self):
 
         """
-        Join the current thread.
+        Wait for the calls to end.
 
         Returns: None.
 
         """
 
-        self._timer.join()
+        self._finished.wait()
 
     def is_alive(self):
 
         """
-        Queries whether the current thread is still alive.
+        Queries whether calls are still scheduled or in progress.
 
-        Returns: self._timer.isAlive()
+        Returns: True until the calls end.
 
         """
 
-        return self._timer.isAlive()
+        return not self._finished.is_set()
 
     def stop(self):
 
         """
-        Cancels the current thread.
+        Stops the calls. A call already in progress is allowed to finish.
 
         Returns: None.
 
         """
 
         logger.info("Stopping thread.")
-        self._timer.cancel()
+        self._stop_event.set()
+        _scheduler.cancel(self._stop_event)
         self.is_running = False
+        self._finished.set()
+
+
+_scheduler = _Scheduler()
 
 
 ###############################################################################
 
-# Set up logging for this module.
-
-log_level_map = {"critical": logging.CRITICAL, "error": logging.ERROR,
-                 "warning": logging.WARNING, "info": logging.INFO,
-                 "debug": logging.DEBUG, "notset": logging.NOTSET}
-
-base_path = os.path.dirname(os.path.realpath(__file__))
-logger_name = __name__
-logger = logging.getLogger(logger_name)
-log_config = ConfigReader(os.path.join(base_path, r"logging.cfg"))
-log_asctime_format = log_config.get_item("logging", "asctime_format")
-log_backup_count = log_config.get_item("logging", "log_backup_count")
-log_directory = log_config.get_item("logging", "log_directory")
-log_format = log_config.get_item("logging", "module_log_format")
-log_extension = log_config.get_item("logging", "log_extension")
-log_level = log_config.get_item("logging", "log_level")
-log_max_bytes = log_config.get_item("logging", "log_max_bytes")
-log_filename = "{0}{1}".format(logger_name, log_extension)
-log_filepath = "{0}/{1}".format(log_directory, log_filename)
-log_formatter = logging.Formatter(log_format, log_asctime_format)
-log_handler = RotatingFileHandler(log_filepath, maxBytes=log_max_bytes,
-                                  backupCount=log_backup_count)
-log_handler.setFormatter(log_formatter)
-logger.setLevel(log_level_map[log_level])
-logger.addHandler(log_handler)
-logger.info("----------------------------------------------------------------")
-logger.info("**** Imported by {0} ****".format(__main__.__file__))
+# Set up logging for this module. The log file is only opened when the module
+# first logs a record.
+
+logger = get_module_logger(__name__)
 
 # END FILE